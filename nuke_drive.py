@@ -3,27 +3,38 @@
 Drive Nuclear Mode - Remove all sharing from Google Drive files.
 
 Handles 40k+ files with:
-- Resumable progress (saves state to JSON)
-- Rate limiting with exponential backoff
+- Resumable progress (appends checkpoints to a JSON-lines journal)
+- Rate limiting under the Drive quota, with jittered backoff on errors
 - Detailed logging to CSV
 - Rich terminal interface with live stats
 """
 
 import os
 import sys
+import argparse
+import atexit
 import json
 import csv
 import time
 import signal
+import random
+import sqlite3
 import shutil
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from datetime import datetime, timedelta
 from pathlib import Path
 
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
 
 # OAuth scopes needed
 SCOPES = ['https://www.googleapis.com/auth/drive']
@@ -32,13 +43,57 @@ SCOPES = ['https://www.googleapis.com/auth/drive']
 CREDENTIALS_FILE = 'credentials.json'
 TOKEN_FILE = 'token.json'
 STATE_FILE = 'nuke_state.json'
+STATE_OPEN_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_CLOEXEC', 0) | getattr(os, 'O_BINARY', 0)
 LOG_FILE = 'permission_removal_log.csv'
 ERROR_FILE = 'errors.csv'
+PROCESSED_DB = 'processed.sqlite'
+CHANGES_TOKEN_FILE = 'changes_token.txt'
 
 # Rate limiting
-BASE_DELAY = 0.1  # 100ms between requests
+BASE_DELAY = 0.1  # First backoff ceiling after a rate-limited call
 MAX_RETRIES = 5
 BACKOFF_MULTIPLIER = 2
+RETRYABLE_STATUSES = frozenset({403, 429, 500, 503})
+QUOTA_REQUESTS = 12000  # Drive's per-user quota: queries per QUOTA_WINDOW
+QUOTA_WINDOW = 60  # seconds
+QUOTA_HEADROOM = 0.9  # Share of the quota we let ourselves use
+MAX_COOLDOWN = 60  # Longest wait after retries are exhausted, in seconds
+COOLDOWN_RESET_PAGES = 20  # Clean pages in a row before that wait drops back
+
+# Drive query matching items shared by link, to this domain or to anyone
+LINK_SHARED_QUERY = (
+    "(visibility='anyoneWithLink' or visibility='anyoneCanFind'"
+    " or visibility='domainWithLink' or visibility='domainCanFind')"
+)
+# Passes run by each mode, in order; every pass covers files then folders
+MODE_PASSES = {
+    'link': ['link'],
+    'full': ['link', 'full'],
+}
+
+LINK_TYPES = frozenset({'anyone', 'domain'})
+SHARE_TYPES = frozenset({'user', 'group'})
+
+# Fields requested for each item, with its permissions inline
+PERMISSION_FIELDS = 'id,type,role,emailAddress'
+ITEM_FIELDS = f'id, name, mimeType, shared, ownedByMe, permissions({PERMISSION_FIELDS})'
+
+# Batching
+PAGE_SIZE = 1000  # Drive's files.list maximum; it may return fewer per page
+BATCH_SIZE = 100  # Drive accepts at most 100 calls per batch request
+
+# Concurrency
+WORKERS = 16  # Pages processed in parallel, each worker with its own client
+PREFETCH_PAGES = 16  # Listed pages buffered ahead of the workers
+HTTP_TIMEOUT = 60  # Seconds before a stalled request is abandoned
+
+# Logging
+LOG_BUFFER_SIZE = 65536
+LOG_FLUSH_EVERY = 1000  # Rows buffered before the CSV logs are flushed
+LOG_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+# Resume
+DONE_COMMIT_EVERY = 500  # Finished item IDs recorded per sqlite commit
 
 # Terminal colors
 class Colors:
@@ -52,10 +107,53 @@ class Colors:
     DIM = '\033[2m'
     RESET = '\033[0m'
 
+# Progress output
+PROGRESS_EVERY = 25  # Untouched items are echoed once per this many
+PROGRESS_REMOVED_LINE = (
+    '[{files:,}] ' + f'{Colors.GREEN}✓{Colors.RESET} ' + '{name}'
+    + f' {Colors.GREEN}(-{{removed}} perms){Colors.RESET}\n'
+)
+PROGRESS_UNCHANGED_LINE = '[{files:,}] ' + f'{Colors.DIM}○{Colors.RESET} ' + '{name}\n'
+
+
+class RateLimiter:
+    """Sliding-window call limiter shared by all threads."""
+
+    def __init__(self, max_calls, window):
+        self.max_calls = max_calls
+        self.window = window
+        self.calls = deque()
+        self.lock = threading.Lock()
+
+    def acquire(self, count=1):
+        """Block until `count` more calls fit in the window, then record them."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                while self.calls and now - self.calls[0] >= self.window:
+                    self.calls.popleft()
+
+                if not self.calls or len(self.calls) + count <= self.max_calls:
+                    self.calls.extend([now] * count)
+                    return
+
+                wait = self.window - (now - self.calls[0])
+
+            time.sleep(wait)
+
+
 # Global state
 shutdown_requested = False
 terminal_width = 80
 start_time = None
+_thread_local = threading.local()
+rate_limiter = RateLimiter(int(QUOTA_REQUESTS * QUOTA_HEADROOM), QUOTA_WINDOW)
+_log_queue = queue.Queue()
+_log_writer = None
+_log_timestamp = (0, '')  # (epoch second, formatted timestamp)
+_state_fd = None  # Append handle for the state journal
+_saved_state = {}  # State as of the last checkpoint, for computing deltas
+_MISSING = object()
 
 
 def signal_handler(sig, frame):
@@ -63,22 +161,32 @@ def signal_handler(sig, frame):
     global shutdown_requested
     print(f'\n\n{Colors.YELLOW}⏸  Shutdown requested. Saving progress...{Colors.RESET}')
     shutdown_requested = True
+    flush_log_files()
+
+
+def update_terminal_width(sig=None, frame=None):
+    """Re-read the terminal width (at startup and on SIGWINCH)."""
+    global terminal_width
+    try:
+        terminal_width = shutil.get_terminal_size().columns
+    except:
+        terminal_width = 80
 
 
 signal.signal(signal.SIGINT, signal_handler)
+if hasattr(signal, 'SIGWINCH'):
+    signal.signal(signal.SIGWINCH, update_terminal_width)
+update_terminal_width()
 
 
 def get_terminal_width():
     """Get terminal width for formatting."""
-    try:
-        return shutil.get_terminal_size().columns
-    except:
-        return 80
+    return terminal_width
 
 
 def clear_line():
     """Clear current line."""
-    print('\r' + ' ' * get_terminal_width() + '\r', end='')
+    sys.stdout.write('\r' + ' ' * terminal_width + '\r')
 
 
 def format_number(n):
@@ -141,9 +249,14 @@ def print_status_box(state, current_file='', rate=''):
 
 
 def print_progress_update(state, current_file, removed_count=0):
-    """Print a single line progress update."""
+    """Print a single line progress update.
+
+    Items that had permissions removed are always shown; untouched items
+    only every PROGRESS_EVERY items, so the terminal keeps up with the workers.
+    """
     files = state.get('files_processed', 0)
-    removed = state.get('permissions_removed', 0)
+    if removed_count == 0 and files % PROGRESS_EVERY:
+        return
 
     # Truncate filename
     max_name_len = 40
@@ -152,20 +265,11 @@ def print_progress_update(state, current_file, removed_count=0):
     else:
         display_name = current_file
 
-    status = f'[{format_number(files)}] '
-
+    clear_line()
     if removed_count > 0:
-        status += f'{Colors.GREEN}✓{Colors.RESET} '
+        sys.stdout.write(PROGRESS_REMOVED_LINE.format(files=files, name=display_name, removed=removed_count))
     else:
-        status += f'{Colors.DIM}○{Colors.RESET} '
-
-    status += f'{display_name}'
-
-    if removed_count > 0:
-        status += f' {Colors.GREEN}(-{removed_count} perms){Colors.RESET}'
-
-    clear_line()
-    print(status)
+        sys.stdout.write(PROGRESS_UNCHANGED_LINE.format(files=files, name=display_name))
 
 
 def print_summary(state):
@@ -202,12 +306,15 @@ def print_resume_info(state):
     files = state.get('files_processed', 0)
     removed = state.get('permissions_removed', 0)
     phase = state.get('phase', 'files')
+    mode = state.get('mode', 'full')
+    current_pass = state.get('pass', 'full')
 
-    if files > 0:
+    if files > 0 or phase != 'files' or current_pass != 'link':
         print(f'{Colors.YELLOW}► Resuming previous session{Colors.RESET}')
-        print(f'  Already processed: {format_number(files)} items')
+        print(f'  Already processed: {format_number(files)} items in this pass')
         print(f'  Permissions removed: {format_number(removed)}')
-        print(f'  Phase: {phase.upper()}')
+        print(f'  Phase: {phase.upper()} ({current_pass.upper()} pass)')
+        print(f'  Mode: {mode.upper()}')
         print()
 
 
@@ -247,29 +354,138 @@ def get_credentials():
 
 
 def load_state():
-    """Load progress state from file."""
+    """Load progress state from file.
+
+    The state file is a journal of JSON lines, each holding the keys that
+    changed at a checkpoint; folding them in order gives the latest state.
+    A torn last line from a crash is skipped, and a file in the old
+    single-document format is read whole. Either way the journal is
+    compacted before new checkpoints are appended to it.
+    """
     if os.path.exists(STATE_FILE):
         with open(STATE_FILE, 'r') as f:
-            return json.load(f)
+            content = f.read()
+
+        try:
+            state = json.loads(content)
+        except ValueError:
+            state = {}
+            for line in content.splitlines():
+                try:
+                    state.update(json.loads(line))
+                except ValueError:
+                    continue
+
+        if isinstance(state, dict) and state:
+            compact_state(state)
+            return state
+
+        remove_state_file()
+
     return {
         'page_token': None,
         'files_processed': 0,
         'permissions_removed': 0,
         'errors': 0,
         'started_at': datetime.now().isoformat(),
-        'phase': 'files'
+        'phase': 'files',
+        'mode': 'full',
+        'pass': 'link'
     }
 
 
 def save_state(state):
-    """Save progress state to file."""
+    """Checkpoint progress by appending what changed to the state journal.
+
+    Each checkpoint is a single write() of one line opened with O_APPEND,
+    so it costs O(changes) and never rewrites earlier checkpoints.
+    """
+    global _state_fd
+
+    state['last_saved'] = datetime.now().isoformat()
+    delta = {key: value for key, value in state.items() if _saved_state.get(key, _MISSING) != value}
+
+    if _state_fd is None:
+        _state_fd = os.open(STATE_FILE, STATE_OPEN_FLAGS, 0o644)
+    os.write(_state_fd, (json.dumps(delta, separators=(',', ':')) + '\n').encode('utf-8'))
+    _saved_state.update(delta)
+
+
+def compact_state(state):
+    """Replace the state journal with a single snapshot of state.
+
+    Writes a temp file and renames it over the journal, so an interrupted
+    compaction leaves the old journal intact. Done at phase boundaries.
+    """
+    global _saved_state
+
+    close_state_file()
     state['last_saved'] = datetime.now().isoformat()
-    with open(STATE_FILE, 'w') as f:
-        json.dump(state, f, indent=2)
+
+    tmp_file = STATE_FILE + '.tmp'
+    with open(tmp_file, 'w') as f:
+        f.write(json.dumps(state, separators=(',', ':')) + '\n')
+    os.replace(tmp_file, STATE_FILE)
+    _saved_state = dict(state)
+
+
+def close_state_file():
+    """Close the state journal's append handle, if open."""
+    global _state_fd
+
+    if _state_fd is not None:
+        os.close(_state_fd)
+        _state_fd = None
+
+
+def remove_state_file():
+    """Delete the state journal once a run is complete."""
+    global _saved_state
+
+    close_state_file()
+    if os.path.exists(STATE_FILE):
+        os.remove(STATE_FILE)
+    _saved_state = {}
+
+
+def open_processed_db(reset=False):
+    """Open the sqlite set of finished item IDs.
+
+    Drive expires page tokens, so a long pause can force re-listing from the
+    start; these IDs let that pass skip items already done. A fresh run
+    (reset) starts from an empty set.
+    """
+    if reset:
+        remove_processed_db()
+
+    conn = sqlite3.connect(PROCESSED_DB)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('CREATE TABLE IF NOT EXISTS done (pass TEXT, id TEXT, PRIMARY KEY (pass, id)) WITHOUT ROWID')
+    return conn
+
+
+def remove_processed_db():
+    """Delete the finished-ID database and its WAL files."""
+    for path in (PROCESSED_DB, PROCESSED_DB + '-wal', PROCESSED_DB + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def is_done(conn, pass_name, file_id):
+    """Check whether an item was already finished in this pass."""
+    row = conn.execute('SELECT 1 FROM done WHERE pass = ? AND id = ?', (pass_name, file_id)).fetchone()
+    return row is not None
+
+
+def mark_done(conn, pass_name, file_ids):
+    """Record items as finished in this pass (committed by the caller)."""
+    conn.executemany('INSERT OR IGNORE INTO done VALUES (?, ?)', [(pass_name, file_id) for file_id in file_ids])
 
 
 def init_log_files():
-    """Initialize CSV log files with headers if they don't exist."""
+    """Initialize CSV log files with headers and start the log writer thread."""
+    global _log_writer
+
     if not os.path.exists(LOG_FILE):
         with open(LOG_FILE, 'w', newline='') as f:
             writer = csv.writer(f)
@@ -280,35 +496,102 @@ def init_log_files():
             writer = csv.writer(f)
             writer.writerow(['timestamp', 'file_id', 'file_name', 'error'])
 
+    if _log_writer is None:
+        _log_writer = threading.Thread(target=write_logs, daemon=True)
+        _log_writer.start()
+        atexit.register(close_log_files)
+
+
+def write_logs():
+    """Writer thread: append queued rows to the CSV logs.
+
+    Both files stay open for the whole run. Rows are flushed every
+    LOG_FLUSH_EVERY rows, when the queue goes idle, or on request.
+    """
+    with open(LOG_FILE, 'a', newline='', buffering=LOG_BUFFER_SIZE) as log_f, \
+            open(ERROR_FILE, 'a', newline='', buffering=LOG_BUFFER_SIZE) as error_f:
+        writers = {'log': csv.writer(log_f), 'err': csv.writer(error_f)}
+        unflushed = 0
+
+        while True:
+            try:
+                entry = _log_queue.get(timeout=1)
+            except queue.Empty:
+                entry = ('flush', None)
+
+            if entry is None:
+                return
+
+            kind, row = entry
+            if kind != 'flush':
+                writers[kind].writerow(row)
+                unflushed += 1
+
+            if unflushed and (kind == 'flush' or unflushed >= LOG_FLUSH_EVERY):
+                log_f.flush()
+                error_f.flush()
+                unflushed = 0
+
+
+def flush_log_files():
+    """Ask the writer thread to flush buffered rows to disk."""
+    _log_queue.put(('flush', None))
+
+
+def close_log_files():
+    """Drain queued rows and stop the writer thread."""
+    global _log_writer
+
+    if _log_writer is not None:
+        _log_queue.put(None)
+        _log_writer.join()
+        _log_writer = None
+
+
+def log_timestamp():
+    """Timestamp for a log row, formatted at most once per second."""
+    global _log_timestamp
+    now = int(time.time())
+    if now != _log_timestamp[0]:
+        _log_timestamp = (now, time.strftime(LOG_TIMESTAMP_FORMAT, time.localtime(now)))
+    return _log_timestamp[1]
+
 
 def log_removal(file_id, file_name, perm_type, details):
     """Log a permission removal to CSV."""
-    with open(LOG_FILE, 'a', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow([datetime.now().isoformat(), file_id, file_name, perm_type, details])
+    _log_queue.put(('log', [log_timestamp(), file_id, file_name, perm_type, details]))
 
 
 def log_error(file_id, file_name, error):
     """Log an error to CSV."""
-    with open(ERROR_FILE, 'a', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow([datetime.now().isoformat(), file_id, file_name, str(error)])
+    _log_queue.put(('err', [log_timestamp(), file_id, file_name, str(error)]))
 
 
-def api_call_with_retry(func, *args, **kwargs):
-    """Execute API call with exponential backoff retry."""
+def retry_delay(error, delay, floor=0):
+    """Seconds to wait before retrying: the server's Retry-After, else jitter in [floor, delay)."""
+    try:
+        return float(error.resp.get('retry-after'))
+    except (TypeError, ValueError):
+        return random.uniform(floor, delay)
+
+
+def api_call_with_retry(func, *args, cost=1, **kwargs):
+    """Execute API call with jittered exponential backoff retry.
+
+    `cost` is the number of quota units the call uses (sub-requests in a batch).
+    """
     delay = BASE_DELAY
 
     for attempt in range(MAX_RETRIES):
+        rate_limiter.acquire(cost)
         try:
-            result = func(*args, **kwargs)
-            time.sleep(BASE_DELAY)
-            return result
+            return func(*args, **kwargs)
         except HttpError as e:
-            if e.resp.status in [403, 429, 500, 503]:
+            if e.resp.status in RETRYABLE_STATUSES:
                 if attempt < MAX_RETRIES - 1:
-                    print(f'{Colors.YELLOW}  ⏳ Rate limited, waiting {delay:.1f}s...{Colors.RESET}')
-                    time.sleep(delay)
+                    wait = retry_delay(e, delay)
+                    print(f'{Colors.YELLOW}  ⏳ Rate limited, waiting {wait:.1f}s...{Colors.RESET}')
+                    time.sleep(wait)
                     delay *= BACKOFF_MULTIPLIER
                     continue
             raise
@@ -316,175 +599,509 @@ def api_call_with_retry(func, *args, **kwargs):
     return None
 
 
+def execute_batch(service, requests):
+    """Execute (request_id, request) pairs as batched HTTP requests.
+
+    Sub-requests that come back rate limited are retried in a fresh batch
+    with jittered backoff. A batch that still fails as a whole records its
+    error for each of its calls, so earlier batches are still reported.
+    Returns a dict of request_id -> (response, error).
+    """
+    results = {}
+    pending = list(requests)
+    delay = BASE_DELAY
+
+    for attempt in range(MAX_RETRIES):
+        retry = []
+        waits = []
+        last_attempt = attempt == MAX_RETRIES - 1
+
+        def on_response(request_id, response, exception):
+            if (isinstance(exception, HttpError) and not last_attempt
+                    and exception.resp.status in RETRYABLE_STATUSES):
+                retry.append(request_id)
+                waits.append(retry_delay(exception, delay))
+            else:
+                results[request_id] = (response, exception)
+
+        for start in range(0, len(pending), BATCH_SIZE):
+            chunk = pending[start:start + BATCH_SIZE]
+            batch = service.new_batch_http_request(callback=on_response)
+            for request_id, request in chunk:
+                batch.add(request, request_id=request_id)
+            try:
+                api_call_with_retry(batch.execute, cost=len(chunk))
+            except HttpError as e:
+                for request_id, _ in chunk:
+                    results[request_id] = (None, e)
+
+        if not retry:
+            break
+
+        wait = max(waits)
+        print(f'{Colors.YELLOW}  ⏳ Rate limited ({len(retry)} calls), waiting {wait:.1f}s...{Colors.RESET}')
+        time.sleep(wait)
+        delay *= BACKOFF_MULTIPLIER
+        by_id = dict(pending)
+        pending = [(request_id, by_id[request_id]) for request_id in retry]
+
+    return results
+
+
 def get_user_email(service):
     """Get the authenticated user's email."""
     about = service.about().get(fields='user').execute()
     return about['user']['emailAddress']
 
 
-def remove_file_permissions(service, file_id, file_name, owner_email):
-    """Remove all non-owner permissions from a file."""
-    removed = 0
-    errors = 0
+def classify_permission(perm, owner_email_lower, link_only=False):
+    """Decide whether a permission should be removed.
 
-    try:
-        permissions = api_call_with_retry(
-            service.permissions().list(
-                fileId=file_id,
-                fields='permissions(id,type,role,emailAddress)'
+    Returns (log_type, details, label) for permissions to remove, or None to keep.
+    With link_only, user and group shares are kept.
+    """
+    perm_type = perm.get('type', '')
+    perm_role = perm.get('role', '')
+    perm_email = perm.get('emailAddress', '')
+
+    if perm_role == 'owner':
+        return None
+
+    if perm_type in LINK_TYPES:
+        return perm_type.upper(), f'{perm_type} link sharing removed', perm_type
+
+    if link_only:
+        return None
+
+    if perm_type in SHARE_TYPES:
+        if perm_email.lower() == owner_email_lower:
+            return None
+        role_name = 'EDITOR' if perm_role == 'writer' else 'VIEWER'
+        return role_name, perm_email, perm_email
+
+    return None
+
+
+def remove_page_permissions(service, items, owner_email_lower, link_only=False):
+    """Remove all non-owner permissions from a page of items.
+
+    Permissions come inline with files.list (only items in My Drive that
+    we own are listed, and Drive returns their permissions in full), so
+    every delete for the page goes out in one round of batches. Returns a
+    dict of file_id -> (removed, errors).
+    """
+    names = {item['id']: item['name'] for item in items}
+    counts = {file_id: [0, 0] for file_id in names}
+
+    targets = {}
+    for item in items:
+        for perm in item.get('permissions', []):
+            removal = classify_permission(perm, owner_email_lower, link_only)
+            if removal:
+                targets[f'{item["id"]}:{perm["id"]}'] = (item['id'], perm['id'], removal)
+
+    results = execute_batch(service, [
+        (request_id, service.permissions().delete(fileId=file_id, permissionId=perm_id))
+        for request_id, (file_id, perm_id, _) in targets.items()
+    ])
+
+    for request_id, (file_id, _, (log_type, details, label)) in targets.items():
+        _, error = results[request_id]
+        if error:
+            log_error(file_id, names[file_id], f'Failed to remove {label}: {error}')
+            counts[file_id][1] += 1
+        else:
+            log_removal(file_id, names[file_id], log_type, details)
+            counts[file_id][0] += 1
+
+    return {file_id: tuple(count) for file_id, count in counts.items()}
+
+
+def build_service(creds):
+    """Build a Drive client whose socket timeout is HTTP_TIMEOUT.
+
+    Same transport build(credentials=...) would set up, but the timeout
+    no longer depends on the library default or socket.setdefaulttimeout().
+    """
+    http = build_http()
+    http.timeout = HTTP_TIMEOUT
+    return build('drive', 'v3', http=AuthorizedHttp(creds, http=http))
+
+
+def get_local_service(creds):
+    """Get this thread's Drive client (httplib2 connections are not thread-safe)."""
+    service = getattr(_thread_local, 'service', None)
+    if service is None:
+        service = build_service(creds)
+        _thread_local.service = service
+    return service
+
+
+def process_page(creds, items, owner_email_lower, link_only):
+    """Worker task: remove sharing from one page of items."""
+    return remove_page_permissions(get_local_service(creds), items, owner_email_lower, link_only)
+
+
+def build_query(is_folder, link_only):
+    """Build the files.list query for one phase of a pass."""
+    query = "mimeType='application/vnd.google-apps.folder'" if is_folder else "mimeType!='application/vnd.google-apps.folder'"
+    # Items owned by others can't be unshared by us; leave them out server-side
+    query += " and 'me' in owners"
+    if link_only:
+        query += f' and {LINK_SHARED_QUERY}'
+    return query
+
+
+def iter_drive_pages(service, query, page_token=None):
+    """Page through files.list lazily.
+
+    Yields (items, page_token, next_page_token) per page, where page_token
+    is the token that fetched it, so callers can checkpoint between pages.
+    """
+    while True:
+        results = api_call_with_retry(
+            service.files().list(
+                q=query,
+                pageSize=PAGE_SIZE,
+                pageToken=page_token,
+                fields=f'nextPageToken, files({ITEM_FIELDS})'
             ).execute
         )
 
-        if not permissions or 'permissions' not in permissions:
-            return removed, errors
+        next_page_token = results.get('nextPageToken')
+        yield results.get('files', []), page_token, next_page_token
 
-        for perm in permissions['permissions']:
-            perm_id = perm['id']
-            perm_type = perm.get('type', '')
-            perm_role = perm.get('role', '')
-            perm_email = perm.get('emailAddress', '')
+        if not next_page_token:
+            return
+        page_token = next_page_token
 
-            if perm_role == 'owner':
-                continue
 
-            if perm_type in ['anyone', 'domain']:
-                try:
-                    api_call_with_retry(
-                        service.permissions().delete(
-                            fileId=file_id,
-                            permissionId=perm_id
-                        ).execute
-                    )
-                    log_removal(file_id, file_name, perm_type.upper(), f'{perm_type} link sharing removed')
-                    removed += 1
-                except HttpError as e:
-                    log_error(file_id, file_name, f'Failed to remove {perm_type}: {e}')
-                    errors += 1
-                continue
+def iter_change_pages(service, page_token, cursor):
+    """Page through the changes feed lazily, from a saved position.
 
-            if perm_type in ['user', 'group']:
-                if perm_email.lower() == owner_email.lower():
-                    continue
+    Yields pages shaped like iter_drive_pages, holding the current version
+    of each changed item. The feed position to resume from next time is
+    left in cursor['new_start_page_token'] once the last page is read.
+    """
+    while True:
+        results = api_call_with_retry(
+            service.changes().list(
+                pageToken=page_token,
+                pageSize=PAGE_SIZE,
+                restrictToMyDrive=True,
+                includeRemoved=False,
+                fields=f'nextPageToken, newStartPageToken, changes(file({ITEM_FIELDS}))'
+            ).execute
+        )
 
-                try:
-                    api_call_with_retry(
-                        service.permissions().delete(
-                            fileId=file_id,
-                            permissionId=perm_id
-                        ).execute
-                    )
-                    role_name = 'EDITOR' if perm_role == 'writer' else 'VIEWER'
-                    log_removal(file_id, file_name, role_name, perm_email)
-                    removed += 1
-                except HttpError as e:
-                    log_error(file_id, file_name, f'Failed to remove {perm_email}: {e}')
-                    errors += 1
+        # A file changed several times can appear more than once
+        items = {}
+        for change in results.get('changes', []):
+            if change.get('file'):
+                items[change['file']['id']] = change['file']
 
-    except HttpError as e:
-        log_error(file_id, file_name, f'Failed to list permissions: {e}')
-        errors += 1
+        next_page_token = results.get('nextPageToken')
+        if not next_page_token:
+            cursor['new_start_page_token'] = results.get('newStartPageToken')
+        yield list(items.values()), page_token, next_page_token
 
-    return removed, errors
+        if not next_page_token:
+            return
+        page_token = next_page_token
 
 
-def process_items(service, state, owner_email, is_folder=False):
-    """Process files or folders and remove sharing."""
-    global shutdown_requested
+def get_start_page_token(service):
+    """Get the changes feed position for changes made from now on."""
+    response = api_call_with_retry(service.changes().getStartPageToken().execute)
+    return response['startPageToken']
 
-    item_type = 'folder' if is_folder else 'file'
-    mime_query = "mimeType='application/vnd.google-apps.folder'" if is_folder else "mimeType!='application/vnd.google-apps.folder'"
 
-    page_token = state.get('page_token')
-    batch_count = 0
-    items_this_session = 0
-    session_start = time.time()
+def load_changes_token():
+    """Load the changes feed position saved by the last completed run."""
+    if os.path.exists(CHANGES_TOKEN_FILE):
+        with open(CHANGES_TOKEN_FILE, 'r') as f:
+            return f.read().strip() or None
+    return None
 
-    print(f'{Colors.CYAN}► Processing {item_type}s...{Colors.RESET}')
-    print()
 
-    while True:
-        if shutdown_requested:
-            save_state(state)
-            print()
-            print(f'{Colors.YELLOW}Progress saved. Run again to resume.{Colors.RESET}')
-            return False
+def save_changes_token(token):
+    """Save the changes feed position for the next --incremental run."""
+    with open(CHANGES_TOKEN_FILE, 'w') as f:
+        f.write(token)
 
-        try:
-            results = api_call_with_retry(
-                service.files().list(
-                    q=mime_query,
-                    pageSize=100,
-                    pageToken=page_token,
-                    fields='nextPageToken, files(id, name, mimeType)',
-                    supportsAllDrives=True,
-                    includeItemsFromAllDrives=True
-                ).execute
-            )
-
-            items = results.get('files', [])
-
-            if not items and not page_token:
-                print(f'{Colors.DIM}No {item_type}s found.{Colors.RESET}')
+
+def list_pages(creds, make_pages, pages, stop):
+    """Producer: move pages from make_pages(service) onto a bounded queue.
+
+    Listing runs ahead of the workers so enumeration round-trips overlap
+    permission work, on this thread's own client. An HttpError is queued
+    instead if listing fails, with first_page set when it failed before
+    any page was listed.
+    """
+    def put(entry):
+        while not stop.is_set():
+            try:
+                pages.put(entry, timeout=0.5)
                 return True
+            except queue.Full:
+                pass
+        return False
 
-            for item in items:
-                if shutdown_requested:
-                    save_state(state)
-                    return False
+    first_page = True
+    try:
+        for page in make_pages(get_local_service(creds)):
+            first_page = False
+            if not put(page):
+                return
+    except HttpError as e:
+        e.first_page = first_page
+        put(e)
 
-                file_id = item['id']
-                file_name = item['name']
 
-                state['files_processed'] += 1
-                items_this_session += 1
+def process_items(creds, state, owner_email_lower, processed_db, is_folder=False):
+    """Process files or folders and remove sharing.
 
-                removed, errors = remove_file_permissions(service, file_id, file_name, owner_email)
-                state['permissions_removed'] += removed
-                state['errors'] += errors
+    In the link pass Drive only returns link-shared items, so unshared items
+    are never enumerated and only link permissions are removed. The full
+    pass enumerates everything for user and group shares.
 
-                # Print progress
-                print_progress_update(state, file_name, removed)
+    Pages are listed by a producer thread and handed to a pool of workers.
+    Results are applied to state in page order, so the saved page token only
+    ever points past pages that are fully done. State is only touched here.
+    Items finished without errors are recorded in processed_db and skipped
+    if they are listed again.
 
-                # Show stats every 100 items
-                if state['files_processed'] % 100 == 0:
-                    elapsed = time.time() - session_start
-                    rate = f'{items_this_session / elapsed:.1f}/s' if elapsed > 0 else '-'
-                    print()
-                    print(f'{Colors.CYAN}── Stats ──{Colors.RESET}')
-                    print(f'  Processed: {Colors.BOLD}{format_number(state["files_processed"])}{Colors.RESET}')
-                    print(f'  Removed:   {Colors.GREEN}{format_number(state["permissions_removed"])}{Colors.RESET}')
-                    print(f'  Errors:    {Colors.RED if state["errors"] > 0 else Colors.DIM}{format_number(state["errors"])}{Colors.RESET}')
-                    print(f'  Rate:      {rate}')
-                    print()
-                    save_state(state)
+    The changes phase reads the changes feed instead of listing everything,
+    and records where the feed ends in state['changes_token'].
+    """
+    global shutdown_requested
 
-                batch_count += 1
+    item_type = 'folder' if is_folder else 'file'
+    pass_name = state.get('pass', 'full')
+    link_only = pass_name == 'link'
+    incremental = state['phase'] == 'changes'
+    if incremental:
+        item_type = 'changed item'
+    elif link_only:
+        item_type = f'link-shared {item_type}'
+    query = build_query(is_folder, link_only)
+    cursor = {}
 
-            page_token = results.get('nextPageToken')
-            state['page_token'] = page_token
+    batch_count = 0
+    unsaved_done = 0
+    items_this_session = 0
+    session_start = time.time()
+    in_flight = deque()  # (future, items, next_page_token) in page order
+    # Picks up the backoff curve where api_call_with_retry gave up
+    initial_cooldown = BASE_DELAY * BACKOFF_MULTIPLIER ** MAX_RETRIES
+    cooldown = initial_cooldown
+    clean_pages = 0
 
-            if not page_token:
+    print(f'{Colors.CYAN}► Processing {item_type}s...{Colors.RESET}')
+    print()
+
+    def checkpoint():
+        """Save state, with the finished IDs it counts committed first."""
+        nonlocal unsaved_done
+        processed_db.commit()
+        unsaved_done = 0
+        save_state(state)
+
+    def commit_page(future, items, next_page_token):
+        nonlocal batch_count, unsaved_done, items_this_session, cooldown, clean_pages
+
+        page_counts = future.result()
+        clean_pages += 1
+        if clean_pages >= COOLDOWN_RESET_PAGES:
+            cooldown = initial_cooldown
+        finished = []
+
+        for item in items:
+            file_name = item['name']
+
+            state['files_processed'] += 1
+            items_this_session += 1
+
+            removed, errors = page_counts.get(item['id'], (0, 0))
+            state['permissions_removed'] += removed
+            state['errors'] += errors
+            if not errors:
+                finished.append(item['id'])
+
+            # Print progress
+            print_progress_update(state, file_name, removed)
+
+            # Show stats every 100 items
+            if state['files_processed'] % 100 == 0:
+                elapsed = time.time() - session_start
+                rate = f'{items_this_session / elapsed:.1f}/s' if elapsed > 0 else '-'
                 print()
-                print(f'{Colors.GREEN}✓ Completed all {item_type}s{Colors.RESET}')
-                return True
+                print(f'{Colors.CYAN}── Stats ──{Colors.RESET}')
+                print(f'  Processed: {Colors.BOLD}{format_number(state["files_processed"])}{Colors.RESET}')
+                print(f'  Removed:   {Colors.GREEN}{format_number(state["permissions_removed"])}{Colors.RESET}')
+                print(f'  Errors:    {Colors.RED if state["errors"] > 0 else Colors.DIM}{format_number(state["errors"])}{Colors.RESET}')
+                print(f'  Rate:      {rate}')
+                print()
+                checkpoint()
 
-            if batch_count >= 500:
-                save_state(state)
-                batch_count = 0
+            batch_count += 1
 
-        except HttpError as e:
-            print(f'{Colors.RED}API Error: {e}{Colors.RESET}')
-            save_state(state)
-            if e.resp.status in [403, 429]:
-                print(f'{Colors.YELLOW}Rate limited. Waiting 60 seconds...{Colors.RESET}')
-                time.sleep(60)
+        state['page_token'] = next_page_token
+
+        mark_done(processed_db, pass_name, finished)
+        unsaved_done += len(finished)
+        if unsaved_done >= DONE_COMMIT_EVERY:
+            processed_db.commit()
+            unsaved_done = 0
+
+        if batch_count >= 5000:
+            checkpoint()
+            batch_count = 0
+
+    def keep_finished(advance):
+        """Commit in-flight pages whose workers finished, in page order.
+
+        After the first failed page, later pages are still recorded as done
+        but the page token stays before the failure, so it is listed again.
+        """
+        while in_flight:
+            future, items, next_page_token = in_flight.popleft()
+            if future.exception() is not None:
+                advance = False
+                continue
+            commit_page(future, items, next_page_token if advance else state['page_token'])
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        while True:
+            pages = queue.Queue(maxsize=PREFETCH_PAGES)
+            stop = threading.Event()
+            start_token = state.get('page_token')
+            if incremental:
+                make_pages = partial(iter_change_pages, page_token=start_token, cursor=cursor)
             else:
-                raise
+                make_pages = partial(iter_drive_pages, query=query, page_token=start_token)
+            producer = threading.Thread(target=list_pages, args=(creds, make_pages, pages, stop), daemon=True)
+            producer.start()
+
+            listing_failed = False
+            try:
+                while True:
+                    if shutdown_requested:
+                        while in_flight:
+                            commit_page(*in_flight.popleft())
+                        processed_db.commit()
+                        compact_state(state)
+                        print()
+                        print(f'{Colors.YELLOW}Progress saved. Run again to resume.{Colors.RESET}')
+                        return False
+
+                    try:
+                        page = pages.get(timeout=0.5)
+                    except queue.Empty:
+                        continue
+
+                    if isinstance(page, HttpError):
+                        listing_failed = True
+                        raise page
+
+                    items, page_token, next_page_token = page
+
+                    if not items and not page_token and not next_page_token:
+                        print(f'{Colors.DIM}No {item_type}s found.{Colors.RESET}')
+                        return True
+
+                    items = [item for item in items if not is_done(processed_db, pass_name, item['id'])]
+
+                    # Unshared items have nothing but the owner permission
+                    shared_items = [item for item in items if item.get('shared') and item.get('ownedByMe')]
+                    future = executor.submit(process_page, creds, shared_items, owner_email_lower, link_only)
+                    in_flight.append((future, items, next_page_token))
+
+                    # Keep at most WORKERS pages in flight; drain everything on the last page
+                    while in_flight and (len(in_flight) >= WORKERS or not next_page_token):
+                        commit_page(*in_flight.popleft())
+
+                    if not next_page_token:
+                        processed_db.commit()
+                        if incremental:
+                            state['changes_token'] = cursor.get('new_start_page_token')
+                        print()
+                        print(f'{Colors.GREEN}✓ Completed all {item_type}s{Colors.RESET}')
+                        return True
+
+            except HttpError as e:
+                print(f'{Colors.RED}API Error: {e}{Colors.RESET}')
+                # The next round lists again; no calls from this one during the cooldown
+                stop.set()
+                producer.join()
+                # A failed worker page was already taken off in_flight
+                keep_finished(advance=listing_failed)
+                checkpoint()
+                # Only the listing call that used the saved token can reject it
+                token_rejected = getattr(e, 'first_page', False) and start_token
+                if e.resp.status == 400 and token_rejected and not incremental:
+                    print(f'{Colors.YELLOW}Saved page token expired. Listing again from the start; '
+                          f'finished items are skipped.{Colors.RESET}')
+                    state['page_token'] = None
+                elif e.resp.status in [403, 429]:
+                    # Equal jitter, so the wait never collapses to nothing
+                    wait = retry_delay(e, cooldown, floor=cooldown / 2)
+                    print(f'{Colors.YELLOW}Rate limited. Waiting {wait:.0f} seconds...{Colors.RESET}')
+                    time.sleep(wait)
+                    cooldown = min(cooldown * BACKOFF_MULTIPLIER, MAX_COOLDOWN)
+                    clean_pages = 0
+                else:
+                    raise
+
+            finally:
+                stop.set()
+
+
+def advance_phase(state, passes):
+    """Move state on to the next phase: files, then folders, then the next pass."""
+    state['page_token'] = None
+
+    if state['phase'] == 'changes':
+        state['phase'] = 'complete'
+        return
+
+    if state['phase'] == 'files':
+        state['phase'] = 'folders'
+        return
+
+    remaining = passes[passes.index(state['pass']) + 1:] if state['pass'] in passes else []
+    if remaining:
+        # Each pass lists the same items again, so items are counted per pass
+        state['pass'] = remaining[0]
+        state['phase'] = 'files'
+        state['files_processed'] = 0
+    else:
+        state['phase'] = 'complete'
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Remove all sharing permissions from Google Drive.')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        '--link-only', dest='mode', action='store_const', const='link',
+        help='only remove "anyone" and domain link sharing (fast: Drive filters to link-shared items)'
+    )
+    mode.add_argument(
+        '--full', dest='mode', action='store_const', const='full',
+        help='remove every non-owner permission (default)'
+    )
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help='only check items changed since the last completed run'
+    )
+    return parser.parse_args()
 
 
 def main():
     """Main entry point."""
     global start_time
+    args = parse_args()
     start_time = time.time()
 
     print_header()
@@ -496,42 +1113,73 @@ def main():
     # Show resume info if applicable
     print_resume_info(state)
 
+    # A resumed session keeps its mode, since saved page tokens belong to its query
+    # State saved before passes existed was already on the full pass
+    state.setdefault('pass', 'full')
+    resuming = state['files_processed'] > 0 or state['phase'] != 'files' or state['pass'] != 'link'
+    if not resuming and args.mode:
+        state['mode'] = args.mode
+    elif args.mode and args.mode != state.get('mode', 'full'):
+        print(f'{Colors.YELLOW}Ignoring --{"link-only" if args.mode == "link" else "full"}: '
+              f'finishing the saved {state.get("mode", "full").upper()} session first.{Colors.RESET}')
+        print()
+    if resuming and args.incremental and state['phase'] != 'changes':
+        print(f'{Colors.YELLOW}Ignoring --incremental: '
+              f'finishing the saved {state.get("mode", "full").upper()} session first.{Colors.RESET}')
+        print()
+
     print(f'{Colors.DIM}Press Ctrl+C at any time to pause and save progress.{Colors.RESET}')
     print()
 
     # Authenticate
     print(f'{Colors.BOLD}Authenticating...{Colors.RESET}')
     creds = get_credentials()
-    service = build('drive', 'v3', credentials=creds)
+    service = build_service(creds)
 
     owner_email = get_user_email(service)
     print(f'{Colors.GREEN}✓ Logged in as: {Colors.BOLD}{owner_email}{Colors.RESET}')
+    owner_email_lower = owner_email.lower()
     print()
 
-    # Process files first
-    if state['phase'] == 'files':
-        completed = process_items(service, state, owner_email, is_folder=False)
-        if completed:
-            state['phase'] = 'folders'
-            state['page_token'] = None
-            save_state(state)
+    processed_db = open_processed_db(reset=not resuming)
+
+    if not resuming:
+        changes_token = load_changes_token() if args.incremental else None
+        if changes_token:
+            state['phase'] = 'changes'
+            state['page_token'] = changes_token
+            # Changed items get the same treatment as the mode's last pass
+            state['pass'] = MODE_PASSES[state['mode']][-1]
+            print(f'{Colors.CYAN}► Incremental run: checking changes since the last completed run{Colors.RESET}')
             print()
         else:
+            if args.incremental:
+                print(f'{Colors.YELLOW}No completed run to continue from; doing a full scan.{Colors.RESET}')
+                print()
+            # Taken before scanning, so the next incremental run also sees
+            # changes made while this one is running
+            state['changes_token'] = get_start_page_token(service)
+
+    # Link-shared items first, then (in full mode) everything else
+    passes = MODE_PASSES[state.get('mode', 'full')]
+    while state['phase'] != 'complete':
+        completed = process_items(creds, state, owner_email_lower, processed_db,
+                                  is_folder=state['phase'] == 'folders')
+        if not completed:
+            processed_db.close()
             return
-
-    # Then process folders
-    if state['phase'] == 'folders':
-        completed = process_items(service, state, owner_email, is_folder=True)
-        if completed:
-            state['phase'] = 'complete'
-            save_state(state)
+        advance_phase(state, passes)
+        compact_state(state)
+        print()
 
     # Done!
+    processed_db.close()
     if state['phase'] == 'complete':
         print_summary(state)
 
-        if os.path.exists(STATE_FILE):
-            os.remove(STATE_FILE)
+        save_changes_token(state.get('changes_token') or get_start_page_token(service))
+        remove_state_file()
+        remove_processed_db()
 
 
 if __name__ == '__main__':
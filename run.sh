@@ -15,4 +15,4 @@ if [ ! -f "credentials.json" ]; then
 fi
 
 source venv/bin/activate
-python3 nuke_drive.py
+python3 nuke_drive.py "$@"